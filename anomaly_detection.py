@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+# Series yang dimonitor dan key untuk baseline (expected value)
+TARGETS = ['cnt', 'casual', 'registered']
+BASELINE_KEYS = ['hr', 'weekday', 'season']
+
+
+class HourlyAnomalyDetector:
+    """Deteksi jam dengan demand tidak wajar (outage stasiun, lonjakan event).
+
+    Expected value tiap jam adalah rata-rata historis per (hr, weekday, season)
+    dari data *sebelum* jam tersebut, dan baru dipakai setelah bucket memiliki
+    minimal `min_count` observasi. Residual terhadap baseline dinilai dengan
+    rolling z-score atas `window` jam sebelumnya (berdasarkan waktu, jadi jam
+    yang hilang di data tidak menggeser window), dengan std per bucket sebagai
+    fallback selama window belum terisi. Z-score lalu dihaluskan dengan EWMA
+    untuk menangkap deviasi moderat yang berlangsung beberapa jam; jam yang
+    tidak diskor (z NaN) dilewati sehingga EWMA membawa nilai sebelumnya,
+    bukan ditarik ke nol. Semua perhitungan vectorized O(n), dan `update()`
+    bisa dipanggil berulang kali saat data baru masuk; tiap batch harus urut
+    secara waktu dan dimulai setelah jam terakhir yang sudah diskor. Hasilnya
+    sama dengan menskor seluruh data sekaligus.
+    """
+
+    def __init__(self, window=168, z_threshold=3.0, ewma_alpha=0.3,
+                 ewma_threshold=2.5, min_periods=24, min_count=3, min_std=1.0):
+        self.window = window
+        self.z_threshold = z_threshold
+        self.ewma_alpha = ewma_alpha
+        self.ewma_threshold = ewma_threshold
+        self.min_periods = min_periods
+        self.min_count = min_count
+        # Data berupa jumlah rental (integer), std di bawah 1 rental tidak bermakna
+        self.min_std = min_std
+
+        # Akumulator baseline: count, sum, sum of squares per key & target
+        self._stats = None
+        # Residual dalam `window` jam terakhir untuk melanjutkan rolling window antar update
+        self._tail = None
+        # Nilai EWMA terakhir per target
+        self._ewma_last = {}
+        # Jam terakhir yang sudah diskor, untuk menolak batch yang tumpang tindih
+        self._last_timestamp = None
+
+    @staticmethod
+    def _moments(n, total, sumsq):
+        mean = total / n
+        var = (sumsq / n - mean ** 2).clip(lower=0)
+        return mean, np.sqrt(var)
+
+    @staticmethod
+    def _timestamps(data):
+        if 'datetime' in data:
+            return pd.DatetimeIndex(data['datetime'])
+        return pd.DatetimeIndex(pd.to_datetime(data['dteday'])
+                                + pd.to_timedelta(data['hr'], unit='h'))
+
+    def _prior_stats(self, data):
+        # Statistik per baris hanya dari data sebelumnya: akumulator sebelum batch ini
+        # ditambah cumulative sum per key di dalam batch, dikurangi baris itu sendiri
+        keys = [data[key] for key in BASELINE_KEYS]
+        values = data[TARGETS].astype(float)
+        observed = values.notna().astype(float)
+
+        if self._stats is None:
+            prev = {stat: pd.DataFrame(0.0, index=data.index, columns=TARGETS)
+                    for stat in ['n', 'sum', 'sumsq']}
+        else:
+            lookup = self._stats.reindex(pd.MultiIndex.from_frame(data[BASELINE_KEYS])).fillna(0)
+            lookup.index = data.index
+            prev = {stat: lookup[stat] for stat in ['n', 'sum', 'sumsq']}
+
+        n = prev['n'] + observed.groupby(keys).cumsum() - observed
+        total = prev['sum'] + values.groupby(keys).cumsum() - values.fillna(0)
+        sumsq = prev['sumsq'] + (values ** 2).groupby(keys).cumsum() - (values ** 2).fillna(0)
+
+        mean, std = self._moments(n, total, sumsq)
+        enough = n >= self.min_count
+        return mean.where(enough), std.where(enough)
+
+    def _update_baseline(self, data):
+        values = data[TARGETS].astype(float)
+        grouped = values.groupby([data[key] for key in BASELINE_KEYS])
+        stats = pd.concat({
+            'n': grouped.count(),
+            'sum': grouped.sum(),
+            'sumsq': (values ** 2).groupby([data[key] for key in BASELINE_KEYS]).sum(),
+        }, axis=1)
+
+        if self._stats is None:
+            self._stats = stats
+        else:
+            self._stats = self._stats.add(stats, fill_value=0)
+
+    def baseline(self):
+        """Expected value dan standar deviasi per (hr, weekday, season)."""
+        if self._stats is None:
+            raise ValueError("Detector belum menerima data, panggil update() terlebih dahulu.")
+
+        mean, std = self._moments(self._stats['n'], self._stats['sum'], self._stats['sumsq'])
+        return pd.concat({'expected': mean, 'std': std}, axis=1)
+
+    def _rolling(self, resid):
+        # Window berbasis waktu, closed='left' agar jam yang dinilai tidak ikut dalam statistiknya
+        history = resid if self._tail is None else pd.concat([self._tail, resid])
+        rolling = history.rolling(f'{self.window}h', closed='left', min_periods=self.min_periods)
+        offset = len(history) - len(resid)
+        roll_mean = rolling.mean().iloc[offset:]
+        roll_std = rolling.std().iloc[offset:]
+
+        self._tail = history[history.index >= history.index[-1] - pd.Timedelta(hours=self.window)]
+        return roll_mean, roll_std
+
+    def _ewma(self, z, target):
+        # Lanjutkan EWMA dari update sebelumnya dengan menaruh nilai terakhir di depan.
+        # ignore_na=True + ffill: jam tanpa z membawa nilai EWMA sebelumnya.
+        last = self._ewma_last.get(target)
+        if last is None:
+            ewma = z.ewm(alpha=self.ewma_alpha, adjust=False, ignore_na=True).mean().ffill()
+        else:
+            seeded = pd.concat([pd.Series([last]), z], ignore_index=True)
+            ewma = seeded.ewm(alpha=self.ewma_alpha, adjust=False, ignore_na=True).mean().ffill().iloc[1:]
+            ewma.index = z.index
+
+        if len(ewma) and pd.notna(ewma.iloc[-1]):
+            self._ewma_last[target] = ewma.iloc[-1]
+        return ewma
+
+    def _check_order(self, timestamps):
+        if not (timestamps.is_monotonic_increasing and timestamps.is_unique):
+            raise ValueError("Baris dalam batch harus urut secara waktu dan tidak boleh duplikat.")
+        if self._last_timestamp is not None and timestamps[0] <= self._last_timestamp:
+            raise ValueError(
+                f"Batch dimulai pada {timestamps[0]}, tidak setelah jam terakhir yang sudah "
+                f"diskor ({self._last_timestamp}). Kirim hanya baris yang baru."
+            )
+
+    def update(self, new_rows):
+        """Skor baris baru terhadap data sebelumnya, lalu tambahkan ke baseline.
+
+        Kolom yang ditambahkan per target: `{target}_expected`, `{target}_resid`,
+        `{target}_z`, `{target}_ewma` dan `{target}_anomaly`, serta kolom gabungan
+        `is_anomaly`. Baris yang bucket-nya belum memiliki `min_count` observasi
+        tidak diskor (expected dan z bernilai NaN). Raise ValueError jika batch
+        tidak urut atau tumpang tindih dengan data yang sudah diskor.
+        """
+        scored = new_rows.copy()
+        if scored.empty:
+            return scored
+
+        timestamps = self._timestamps(scored)
+        self._check_order(timestamps)
+        self._last_timestamp = timestamps[-1]
+
+        expected, bucket_std = self._prior_stats(scored)
+        self._update_baseline(scored)
+
+        resid = scored[TARGETS].astype(float) - expected
+        for target in TARGETS:
+            scored[f'{target}_expected'] = expected[target]
+            scored[f'{target}_resid'] = resid[target]
+
+        resid.index = timestamps
+        roll_mean, roll_std = self._rolling(resid)
+
+        for target in TARGETS:
+            mean = roll_mean[target].values
+            std = roll_std[target].values
+            rolling_z = (resid[target].values - mean) / np.where(std >= self.min_std, std, np.nan)
+            # Selama rolling window belum terisi, pakai std per bucket
+            fallback_z = resid[target].values / bucket_std[target].clip(lower=self.min_std).values
+            z = pd.Series(np.where(np.isnan(rolling_z), fallback_z, rolling_z), index=scored.index)
+            ewma = self._ewma(z, target)
+
+            scored[f'{target}_z'] = z
+            scored[f'{target}_ewma'] = ewma
+
+        return flag_anomalies(scored, self.z_threshold, self.ewma_threshold)
+
+
+def flag_anomalies(scored, z_threshold=3.0, ewma_threshold=2.5):
+    """Tandai anomali dari kolom `_z` dan `_ewma` hasil `update()` tanpa menskor ulang."""
+    flagged = scored.copy()
+    flagged['is_anomaly'] = False
+    for target in TARGETS:
+        flagged[f'{target}_anomaly'] = (
+            (flagged[f'{target}_z'].abs() >= z_threshold)
+            | (flagged[f'{target}_ewma'].abs() >= ewma_threshold)
+        )
+        flagged['is_anomaly'] |= flagged[f'{target}_anomaly']
+    return flagged
+
+
+def detect_anomalies(data, chunk_size=None, **kwargs):
+    """Skor seluruh data sekaligus, atau per chunk untuk mensimulasikan data yang masuk bertahap."""
+    detector = HourlyAnomalyDetector(**kwargs)
+    if chunk_size is None:
+        return detector.update(data)
+
+    chunks = [detector.update(data.iloc[i:i + chunk_size])
+              for i in range(0, len(data), chunk_size)]
+    return pd.concat(chunks)
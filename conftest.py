@@ -0,0 +1 @@
+# Root conftest agar `pytest` bisa mengimpor modul di root (mis. anomaly_detection)
@@ -10,6 +10,7 @@ from sklearn.decomposition import PCA
 import seaborn as sns
 import matplotlib.pyplot as plt
 from datetime import datetime
+from anomaly_detection import HourlyAnomalyDetector, TARGETS, flag_anomalies
 
 # Page configuration
 st.set_page_config(
@@ -99,6 +100,12 @@ def load_data():
     
     return df
 
+# Anomaly detection
+@st.cache_data
+def score_anomalies(data, window):
+    detector = HourlyAnomalyDetector(window=window)
+    return detector.update(data.sort_values('datetime'))
+
 # Load data
 with st.spinner('Loading data...'):
     df = load_data()
@@ -193,7 +200,7 @@ with col5:
 st.markdown("---")
 
 # Tabs
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "⏰ Temporal Analysis", "🌤️ Weather Impact", "👥 User Segmentation", "🎯 Clustering"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 Overview", "⏰ Temporal Analysis", "🌤️ Weather Impact", "👥 User Segmentation", "🎯 Clustering", "🚨 Anomaly Detection"])
 
 # TAB 1: Overview
 with tab1:
@@ -661,6 +668,111 @@ with tab5:
     """)
     st.markdown('</div>', unsafe_allow_html=True)
 
+# TAB 6: Anomaly Detection
+with tab6:
+    st.header("🚨 Hourly Demand Anomaly Detection")
+    
+    st.markdown("""
+    Expected demand dihitung dari rata-rata historis per **(hour, weekday, season)** sebelum jam
+    tersebut. Jam ditandai anomali jika rolling z-score residual melewati threshold (lonjakan/penurunan
+    mendadak, garis merah) atau jika EWMA dari z-score melewati threshold (deviasi yang berlangsung
+    beberapa jam, garis ungu).
+    """)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        anomaly_target = st.selectbox("Series", TARGETS, format_func=lambda x: {
+            'cnt': 'Total (cnt)', 'casual': 'Casual', 'registered': 'Registered'}[x])
+    with col2:
+        window_days = st.slider("Rolling window (days)", min_value=1, max_value=28, value=7)
+    with col3:
+        z_threshold = st.slider("Z-score threshold", min_value=2.0, max_value=6.0, value=3.0, step=0.5)
+    with col4:
+        ewma_threshold = st.slider("EWMA threshold", min_value=1.0, max_value=5.0, value=2.5, step=0.5)
+    
+    # Skor dihitung pada seluruh data agar rolling window kontinu, lalu dibatasi ke filter aktif
+    # Threshold hanya diterapkan pada kolom z/EWMA yang sudah di-cache, tanpa menskor ulang
+    scored_df = flag_anomalies(score_anomalies(df, window_days * 24), z_threshold, ewma_threshold)
+    scored_df = scored_df.loc[scored_df.index.intersection(filtered_df.index)].sort_values('datetime')
+    anomalies = scored_df[scored_df[f'{anomaly_target}_anomaly']]
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Anomalous Hours", f"{len(anomalies):,}")
+    with col2:
+        anomaly_rate = (len(anomalies) / len(scored_df) * 100) if len(scored_df) > 0 else 0
+        st.metric("Anomaly Rate", f"{anomaly_rate:.2f}%")
+    with col3:
+        surge_count = (anomalies[f'{anomaly_target}_resid'] > 0).sum()
+        st.metric("Surges / Drops", f"{surge_count:,} / {len(anomalies) - surge_count:,}")
+    
+    # Actual vs expected
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=scored_df['datetime'], y=scored_df[anomaly_target],
+                            name='Actual', mode='lines', line=dict(color='skyblue', width=1)))
+    fig.add_trace(go.Scatter(x=scored_df['datetime'], y=scored_df[f'{anomaly_target}_expected'],
+                            name='Expected', mode='lines', line=dict(color='green', width=1, dash='dot')))
+    fig.add_trace(go.Scatter(x=anomalies['datetime'], y=anomalies[anomaly_target],
+                            name='Anomaly', mode='markers',
+                            marker=dict(color='red', size=7, symbol='x')))
+    
+    fig.update_layout(
+        title='Actual vs Expected Hourly Rentals',
+        xaxis_title='Date',
+        yaxis_title='Rentals',
+        hovermode='closest',
+        height=450
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=scored_df['datetime'], y=scored_df[f'{anomaly_target}_z'],
+                                name='Rolling Z-score', mode='lines', line=dict(color='coral', width=1)))
+        fig.add_trace(go.Scatter(x=scored_df['datetime'], y=scored_df[f'{anomaly_target}_ewma'],
+                                name='EWMA', mode='lines', line=dict(color='purple', width=2)))
+        fig.add_hline(y=z_threshold, line_dash='dash', line_color='red')
+        fig.add_hline(y=-z_threshold, line_dash='dash', line_color='red')
+        fig.add_hline(y=ewma_threshold, line_dash='dot', line_color='purple')
+        fig.add_hline(y=-ewma_threshold, line_dash='dot', line_color='purple')
+        
+        fig.update_layout(
+            title='Rolling Z-score & EWMA',
+            xaxis_title='Date',
+            yaxis_title='Score',
+            height=400
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        anomaly_hours = anomalies.groupby('hr').size().reindex(range(24), fill_value=0)
+        
+        fig = px.bar(x=anomaly_hours.index, y=anomaly_hours.values,
+                     title='Anomalies by Hour of Day',
+                     labels={'x': 'Hour of Day', 'y': 'Anomalous Hours'},
+                     color_discrete_sequence=['#e74c3c'])
+        
+        fig.update_layout(height=400, xaxis=dict(tickmode='linear'))
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Anomaly list
+    st.subheader("📋 Anomalous Hours")
+    
+    anomaly_table = anomalies[['datetime', 'weekday_label', 'season_label', 'weather_label',
+                               anomaly_target, f'{anomaly_target}_expected',
+                               f'{anomaly_target}_z', f'{anomaly_target}_ewma']].copy()
+    anomaly_table['type'] = np.where(anomalies[f'{anomaly_target}_resid'] > 0, 'Surge', 'Drop')
+    anomaly_table = anomaly_table.round(2)
+    anomaly_table.columns = ['Datetime', 'Day', 'Season', 'Weather', 'Actual', 'Expected',
+                             'Z-score', 'EWMA', 'Type']
+    
+    st.dataframe(anomaly_table.sort_values('Z-score', key=abs, ascending=False),
+                 use_container_width=True, hide_index=True)
+
 # Footer
 st.markdown("---")      
 st.markdown("""
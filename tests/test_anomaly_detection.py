@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomaly_detection import TARGETS, HourlyAnomalyDetector, detect_anomalies
+
+HOUR_CSV = os.path.join(os.path.dirname(__file__), os.pardir, 'hour.csv')
+
+
+@pytest.fixture(scope='module')
+def hourly():
+    return pd.read_csv(HOUR_CSV).iloc[:6000]
+
+
+def _assert_scores_equal(actual, expected):
+    for target in TARGETS:
+        for column in ['expected', 'resid', 'z', 'ewma']:
+            np.testing.assert_allclose(actual[f'{target}_{column}'], expected[f'{target}_{column}'],
+                                       rtol=1e-9, atol=1e-9)
+    pd.testing.assert_series_equal(actual['is_anomaly'], expected['is_anomaly'])
+
+
+@pytest.mark.parametrize('chunk_size', [24, 1000])
+def test_chunked_scoring_matches_batch(hourly, chunk_size):
+    _assert_scores_equal(detect_anomalies(hourly, chunk_size=chunk_size), detect_anomalies(hourly))
+
+
+def test_single_row_updates_match_batch(hourly):
+    data = hourly.iloc[:3200]
+    detector = HourlyAnomalyDetector()
+    seeded = [detector.update(data.iloc[:3000])]
+    seeded += [detector.update(data.iloc[[i]]) for i in range(3000, len(data))]
+
+    _assert_scores_equal(pd.concat(seeded), detect_anomalies(data))
+
+
+def test_overlapping_batch_is_rejected(hourly):
+    detector = HourlyAnomalyDetector()
+    detector.update(hourly.iloc[:1000])
+    stats = detector._stats.copy()
+
+    with pytest.raises(ValueError, match='jam terakhir'):
+        detector.update(hourly.iloc[999:1001])
+    pd.testing.assert_frame_equal(detector._stats, stats)
+
+
+def test_unsorted_batch_is_rejected(hourly):
+    detector = HourlyAnomalyDetector()
+    with pytest.raises(ValueError, match='urut'):
+        detector.update(hourly.iloc[:100].iloc[::-1])
+
+
+def test_ewma_carries_over_unscored_hours(hourly):
+    detector = HourlyAnomalyDetector()
+    scored = detector.update(hourly.iloc[:3000])
+    z = scored['cnt_z'].copy()
+    z.iloc[-50:-10] = np.nan
+
+    ewma = HourlyAnomalyDetector()._ewma(z, 'cnt')
+    assert (ewma.iloc[-50:-10] == ewma.iloc[-51]).all()
+
+
+def _prior_bucket(data, position):
+    row = data.iloc[position]
+    prior = data.iloc[:position]
+    mask = (prior['hr'] == row['hr']) & (prior['weekday'] == row['weekday']) & (prior['season'] == row['season'])
+    return prior.loc[mask, 'cnt']
+
+
+def test_rows_are_scored_against_earlier_data_only(hourly):
+    scored = HourlyAnomalyDetector().update(hourly.iloc[:48])
+
+    # Belum ada bucket dengan observasi sebelumnya yang cukup
+    assert scored['cnt_expected'].isna().all()
+    assert not scored['is_anomaly'].any()
+
+    detector = HourlyAnomalyDetector()
+    detector.update(hourly.iloc[:5000])
+    scored = detector.update(hourly.iloc[5000:5001])
+    assert scored['cnt_expected'].iloc[0] == pytest.approx(_prior_bucket(hourly, 5000).mean())
+
+
+def test_outage_is_flagged(hourly):
+    data = hourly.copy()
+    outage = data.index[(data['dteday'] == '2011-08-10') & data['hr'].between(16, 19)]
+    data.loc[outage, TARGETS] = 0
+
+    scored = detect_anomalies(data)
+    assert scored.loc[outage, 'cnt_anomaly'].all()
+    assert (scored.loc[outage, 'cnt_resid'] < 0).all()
+
+
+def test_window_is_time_based(hourly):
+    # Gap 100 baris = 100 jam kosong, lebih panjang dari window 24 jam
+    gapped = hourly.drop(hourly.index[3000:3100]).reset_index(drop=True)
+
+    scored = detect_anomalies(gapped, window=24, min_periods=1)
+    row = scored.iloc[3000]
+    bucket_std = max(_prior_bucket(gapped, 3000).std(ddof=0), 1.0)
+    assert row['cnt_z'] == pytest.approx(row['cnt_resid'] / bucket_std)